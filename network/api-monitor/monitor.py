@@ -5,21 +5,275 @@ Detecta indisponibilidade até em escala de milissegundos
 """
 
 import argparse
+import array
+import asyncio
+import atexit
+import errno
+import math
+import os
+import platform
+import queue
+import re
 import time
 import sys
 import requests
+import selectors
 import socket
-from datetime import datetime
+import struct
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import signal
-import statistics
 from urllib.parse import urlparse
 import urllib3
+from requests.adapters import HTTPAdapter
 
 # Desabilitar warnings de SSL quando necessário
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Cores ANSI
+GREEN = '\033[92m'
+RED = '\033[91m'
+YELLOW = '\033[93m'
+RESET = '\033[0m'
+BOLD = '\033[1m'
+
+# Rótulos de status já formatados com cor, evitando montá-los a cada verificação
+STATUS_LABELS = {
+    'up': f"{GREEN}{BOLD}✅ UP{RESET}",
+    'slow': f"{YELLOW}{BOLD}⚠️  LENTO{RESET}",
+    'down': f"{RED}{BOLD}❌ DOWN{RESET}",
+}
+
+# Tempo de resposta na saída do comando ping (ex.: "time=12.3 ms", "time<1ms")
+PING_TIME_RE = re.compile(rb'time[=<]([\d.]+)')
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+# Cabeçalho ICMP: tipo, código, checksum, identificador, sequência
+ICMP_HEADER = struct.Struct('!BBHHH')
+
+# Códigos de connect_ex que indicam conexão não bloqueante em andamento
+CONNECT_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK)}
+
+# Log em arquivo: máximo de registros por chamada writev (IOV_MAX) e espera máxima (s) por flush/close
+LOG_MAX_BATCH = 1024
+LOG_FLUSH_TIMEOUT = 5.0
+
+# Log binário: registros de tamanho fixo, little-endian, identificados pelo primeiro byte
+LOG_KIND_CHECK = 1
+LOG_KIND_TARGET = 2
+# tipo, timestamp_ns, sucesso, tempo_resposta_ns, código de erro, id do alvo (22 bytes)
+LOG_CHECK_RECORD = struct.Struct('<BqBqHH')
+# tipo, id do alvo, tamanho do nome (5 bytes, seguidos do nome em UTF-8)
+LOG_TARGET_RECORD = struct.Struct('<BHH')
+
+# Códigos de erro do log binário; status HTTP de erro são gravados diretamente (100-599)
+ERROR_OK = 0
+ERROR_CODES = {
+    'Timeout': 1,
+    'Connection Error': 2,
+    'DNS resolution failed': 3,
+    'Connection refused': 4,
+    'Host unreachable': 5,
+}
+ERROR_OTHER = 9
+
+# Quantidade padrão de amostras de tempo de resposta mantidas em memória
+DEFAULT_MAX_SAMPLES = 100_000
+
+# Espera máxima (s) entre recargas do token bucket no modo --rate; limita também a rajada acumulada
+RATE_MAX_SLEEP = 0.05
+
+# Espera máxima (s) pela verificação de aquecimento antes de iniciar as medições
+WARMUP_TIMEOUT = 0.5
+
+# Tempo (s) que o endereço resolvido de um alvo TCP permanece em cache
+DNS_CACHE_TTL = 60.0
+
+
+def _icmp_checksum(total: int) -> int:
+    """
+    Calcula o checksum de 16 bits em complemento de um (RFC 1071)
+    a partir da soma já calculada das palavras de 16 bits do pacote
+    """
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class TimestampFormatter:
+    """Formata timestamps com milissegundos, reaproveitando o prefixo do segundo atual"""
+    
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self._cached = (None, '')
+    
+    def format(self, t: float) -> str:
+        """Formata um timestamp Unix (segundos) como '<fmt>.mmm'"""
+        # Arredonda para microssegundos como datetime, evitando erro de ponto flutuante nos ms
+        frac, sec = math.modf(t)
+        sec = int(sec)
+        us = round(frac * 1_000_000)
+        if us >= 1_000_000:
+            sec += 1
+            us -= 1_000_000
+        # Tupla trocada atomicamente: segura para uso simultâneo por mais de uma thread
+        cached_sec, prefix = self._cached
+        if sec != cached_sec:
+            prefix = time.strftime(self.fmt, time.localtime(sec))
+            self._cached = (sec, prefix)
+        return f"{prefix}.{us // 1000:03d}"
+
+
+LOG_TIMESTAMP = TimestampFormatter('%Y-%m-%d %H:%M:%S')
+STATUS_TIMESTAMP = TimestampFormatter('%H:%M:%S')
+
+
+def _now_str() -> str:
+    """Retorna o horário atual no formato do log"""
+    return LOG_TIMESTAMP.format(time.time())
+
+
+def error_code(error_msg: Optional[str]) -> int:
+    """Converte a mensagem de erro de uma verificação no código do log binário"""
+    if error_msg is None:
+        return ERROR_OK
+    if error_msg.startswith('HTTP '):
+        return int(error_msg[5:])
+    for prefix, code in ERROR_CODES.items():
+        if error_msg.startswith(prefix):
+            return code
+    return ERROR_OTHER
+
+
+def create_http_session(pool_connections: int = 1, pool_maxsize: int = 1) -> requests.Session:
+    """Cria sessão HTTP persistente (keep-alive), evitando novo handshake TCP/TLS a cada verificação"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'ServiceMonitor/1.0'})
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class LogWriter:
+    """
+    Log em arquivo gravado por uma thread dedicada, fora do caminho das verificações
+    No formato binário só os resultados das verificações são gravados (ver monitor_dump.py)
+    """
+    
+    def __init__(self, path: str, binary: bool = False):
+        self.path = path
+        self.binary = binary
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o644)
+        self._targets = 0
+        self._closed = False
+        # Primeiro erro de escrita; depois dele novos registros são descartados
+        self.error: Optional[OSError] = None
+        
+        # Registros prontos (bytes), linhas de texto (timestamp_ns, mensagem),
+        # pedidos de flush (Event) ou None para encerrar
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def register_target(self, name: str) -> int:
+        """Registra um alvo e retorna seu id nos registros binários"""
+        target_id = self._targets
+        self._targets += 1
+        if self.binary and not self.error:
+            encoded = name.encode('utf-8')
+            self._queue.put_nowait(LOG_TARGET_RECORD.pack(LOG_KIND_TARGET, target_id, len(encoded)) + encoded)
+        return target_id
+    
+    def write(self, message: str):
+        """Enfileira uma linha com timestamp (ignorada no formato binário)"""
+        if self.binary or self.error:
+            return
+        self._queue.put_nowait((time.time_ns(), message))
+    
+    def write_check(self, target_id: int, success: bool, response_time: int, error_msg: Optional[str]):
+        """Enfileira o resultado de uma verificação como registro binário"""
+        if self.error:
+            return
+        self._queue.put_nowait(LOG_CHECK_RECORD.pack(LOG_KIND_CHECK, time.time_ns(), success,
+                                                     response_time, error_code(error_msg), target_id))
+    
+    def flush(self):
+        """Aguarda a gravação de tudo que já foi enfileirado (até LOG_FLUSH_TIMEOUT)"""
+        if self._closed or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put_nowait(done)
+        done.wait(LOG_FLUSH_TIMEOUT)
+    
+    def close(self):
+        """Grava o que restar na fila e fecha o arquivo"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put_nowait(None)
+        self._thread.join(LOG_FLUSH_TIMEOUT)
+        # Se a thread ainda estiver escrevendo, o descritor fica aberto até o fim do processo:
+        # fechá-lo agora poderia fazer o writev cair em outro arquivo que reutilize o número
+        if not self._thread.is_alive():
+            os.close(self._fd)
+    
+    def _drain(self):
+        # Agrupa tudo que estiver na fila em uma única escrita
+        while True:
+            items = [self._queue.get()]
+            while len(items) < LOG_MAX_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            chunks = []
+            waiters = []
+            stop = False
+            for item in items:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif isinstance(item, bytes):
+                    chunks.append(item)
+                else:
+                    ts_ns, message = item
+                    timestamp = LOG_TIMESTAMP.format(ts_ns / 1e9)
+                    chunks.append(f"[{timestamp}] {message}\n".encode('utf-8'))
+            
+            try:
+                if chunks and not self.error:
+                    self._write_chunks(chunks)
+            except OSError as e:
+                # Disco cheio, erro de E/S etc.: avisa uma vez e passa a descartar o log
+                self.error = e
+                print(f"❌ Erro ao gravar log em {self.path}: {e}; novos registros serão descartados",
+                      file=sys.stderr)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+            if stop:
+                return
+    
+    def _write_chunks(self, chunks: list):
+        # writev grava vários registros com uma syscall; sem ele (Windows), junta os bytes
+        if hasattr(os, 'writev'):
+            written = os.writev(self._fd, chunks)
+            if written == sum(len(chunk) for chunk in chunks):
+                return
+            data = b''.join(chunks)[written:]
+        else:
+            data = b''.join(chunks)
+        while data:
+            data = data[os.write(self._fd, data):]
+
 
 @dataclass
 class MonitorStats:
@@ -27,17 +281,17 @@ class MonitorStats:
     total_checks: int = 0
     successful_checks: int = 0
     failed_checks: int = 0
-    response_times: list = None
-    downtime_events: list = None
-    start_time: float = None
-    
-    def __post_init__(self):
-        if self.response_times is None:
-            self.response_times = []
-        if self.downtime_events is None:
-            self.downtime_events = []
-        if self.start_time is None:
-            self.start_time = time.time()
+    # int64 contíguo em ns: 8 bytes por amostra em vez de um objeto Python por item
+    response_times: array.array = field(default_factory=lambda: array.array('q'))
+    downtime_events: list = field(default_factory=list)
+    start_time: float = field(default_factory=time.monotonic)
+    # Tamanho do buffer circular de amostras (0 = ilimitado)
+    max_samples: int = 0
+    # Agregados incrementais dos tempos de resposta em ns (cobrem todas as amostras)
+    response_count: int = 0
+    response_time_sum: int = 0
+    response_time_min: float = math.inf
+    response_time_max: float = -math.inf
     
     def get_uptime_percentage(self) -> float:
         """Calcula porcentagem de uptime"""
@@ -45,156 +299,310 @@ class MonitorStats:
             return 0.0
         return (self.successful_checks / self.total_checks) * 100
     
+    def add_response_time(self, response_time: int):
+        """Registra um tempo de resposta em ns e atualiza os agregados"""
+        # Cresce até max_samples e depois sobrescreve a amostra mais antiga
+        if self.max_samples and self.response_count >= self.max_samples:
+            self.response_times[self.response_count % self.max_samples] = response_time
+        else:
+            self.response_times.append(response_time)
+        self.response_count += 1
+        self.response_time_sum += response_time
+        if response_time < self.response_time_min:
+            self.response_time_min = response_time
+        if response_time > self.response_time_max:
+            self.response_time_max = response_time
+    
     def get_avg_response_time(self) -> float:
         """Retorna tempo médio de resposta em ms"""
-        if not self.response_times:
+        if not self.response_count:
             return 0.0
-        return statistics.mean(self.response_times)
+        return self.response_time_sum / self.response_count / 1e6
+    
+    def get_response_percentiles(self, *percentiles: float) -> list[float]:
+        """Retorna percentis dos tempos de resposta em ms (sobre as amostras mantidas)"""
+        if not self.response_count:
+            return [0.0] * len(percentiles)
+        
+        # Uma única ordenação atende todos os percentis (interpolação linear)
+        ordered = sorted(self.response_times)
+        last = len(ordered) - 1
+        values = []
+        for percentile in percentiles:
+            rank = percentile / 100 * last
+            low = int(rank)
+            high = min(low + 1, last)
+            values.append((ordered[low] + (ordered[high] - ordered[low]) * (rank - low)) / 1e6)
+        return values
     
     def get_median_response_time(self) -> float:
-        """Retorna tempo mediano de resposta em ms"""
-        if not self.response_times:
-            return 0.0
-        return statistics.median(self.response_times)
+        """Retorna tempo mediano de resposta em ms (sobre as amostras mantidas)"""
+        return self.get_response_percentiles(50)[0]
 
 
 class ServiceMonitor:
     """Monitor de serviços com detecção de alta precisão"""
     
+    # Máximo de verificações simultâneas quando uma verificação excede o intervalo
+    # (também o número de threads do executor dedicado de cada monitor)
+    MAX_IN_FLIGHT = 10
+    
     def __init__(self, target: str, check_type: str, interval: float, 
                  timeout: float, threshold: float, log_file: Optional[str] = None,
-                 verify_ssl: bool = True):
+                 verify_ssl: bool = True, max_samples: int = DEFAULT_MAX_SAMPLES,
+                 session: Optional[requests.Session] = None,
+                 log_writer: Optional[LogWriter] = None, label: Optional[str] = None,
+                 rate: Optional[float] = None):
         self.target = target
         self.check_type = check_type
         self.interval = interval
+        # Verificações por segundo; quando definido substitui o intervalo fixo
+        self.rate = rate
         self.timeout = timeout
         self.threshold = threshold
-        self.log_file = log_file
+        # Limites em ns inteiros, comparados diretamente com as medições
+        self._threshold_ns = int(threshold * 1_000_000)
+        self._timeout_ns = int(timeout * 1_000_000_000)
+        self.log_file = log_writer.path if log_writer else log_file
         self.verify_ssl = verify_ssl
-        self.stats = MonitorStats()
+        self.stats = MonitorStats(max_samples=max_samples)
         self.running = True
+        self._interval_warned = False
+        
+        # Executor próprio: toda verificação enfileirada tem uma thread livre para rodar
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_IN_FLIGHT,
+                                            thread_name_prefix='monitor-check')
+        
+        # Identifica o alvo nas saídas quando vários são monitorados juntos
+        self.label = label
+        self._status_prefix = f"{label} | " if label else ""
+        self._log_prefix = f"[{label}] " if label else ""
+        
+        # Sessão HTTP e log podem ser compartilhados entre monitores
+        self._owns_session = session is None
+        self._session = session or create_http_session(pool_maxsize=self.MAX_IN_FLIGHT)
+        self._log_writer = log_writer or (LogWriter(log_file) if log_file else None)
+        if self._log_writer:
+            self._log_target_id = self._log_writer.register_target(target)
+        
+        # host:porta validado e endereço TCP resolvido uma única vez, fora do caminho de cada verificação
+        if check_type == 'tcp':
+            host, _, port = target.rpartition(':')
+            if not host or not port.isdigit() or not 0 < int(port) < 65536:
+                raise ValueError("Formato inválido. Use host:porta")
+            self._tcp_host = host
+            self._tcp_port = int(port)
+            try:
+                self._resolve_tcp_addr()
+            except socket.gaierror:
+                raise ValueError(f"Não foi possível resolver o host: {target}")
         
-        # Configurar handler para Ctrl+C
-        signal.signal(signal.SIGINT, self._signal_handler)
+        # Socket ICMP reutilizado entre verificações (ping sem privilégios no Linux)
+        self._icmp_sock = None
+        if check_type == 'icmp':
+            # Comando ping montado uma única vez conforme o SO
+            is_windows = platform.system().lower() == 'windows'
+            self._ping_argv = [
+                'ping', '-n' if is_windows else '-c', '1',
+                '-w' if is_windows else '-W', str(int(self.timeout)), target
+            ]
+            try:
+                # O socket atende só IPv4: alvos IPv6 ou sem registro A seguem pelo comando ping
+                self._icmp_addr = socket.gethostbyname(target)
+                self._icmp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            except OSError:
+                # Sem permissão para ping via socket ou alvo não IPv4: usa o comando ping do sistema
+                self._icmp_sock = None
+            else:
+                self._icmp_sock.settimeout(self.timeout)
+                self._icmp_ident = os.getpid() & 0xFFFF
+                # Soma fixa das palavras do cabeçalho; a cada envio só a sequência é somada
+                self._icmp_base_sum = (ICMP_ECHO_REQUEST << 8) + self._icmp_ident
+                # Identificador esperado nas respostas, conhecido após o primeiro envio
+                self._icmp_reply_ident = None
+                self._icmp_seq = 0
+                self._icmp_lock = threading.Lock()
+        
+        # Aquece DNS, conexão e TLS em segundo plano para a primeira medição não sair inflada
+        self._warmup_done = threading.Event()
+        self._discard_next_sample = False
+        threading.Thread(target=self._warmup, daemon=True).start()
     
-    def _signal_handler(self, signum, frame):
-        """Handler para interrupção graceful"""
-        print("\n\n🛑 Interrompendo monitoramento...")
-        self.running = False
+    def _warmup(self):
+        """Executa uma verificação descartada antes do início das medições"""
+        try:
+            self._check_service()
+        finally:
+            self._warmup_done.set()
     
     def _log(self, message: str):
         """Registra mensagem em arquivo se configurado"""
-        if self.log_file:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                f.write(f"[{timestamp}] {message}\n")
+        if self._log_writer:
+            self._log_writer.write(f"{self._log_prefix}{message}")
+    
+    def _log_check(self, success: bool, response_time: int, error_msg: Optional[str]):
+        """Registra o resultado de uma verificação no formato de log configurado"""
+        if not self._log_writer:
+            return
+        if self._log_writer.binary:
+            self._log_writer.write_check(self._log_target_id, success, response_time, error_msg)
+        else:
+            log_status = "SUCCESS" if success else "FAILURE"
+            self._log(f"{log_status}: {response_time / 1e6:.2f}ms - {error_msg if error_msg else 'OK'}")
     
-    def _check_http(self) -> tuple[bool, float, Optional[str]]:
+    def _check_http(self) -> tuple[bool, int, Optional[str]]:
         """
         Verifica disponibilidade via HTTP/HTTPS
-        Retorna: (sucesso, tempo_resposta_ms, mensagem_erro)
+        Retorna: (sucesso, tempo_resposta_ns, mensagem_erro)
         """
         try:
-            start_time = time.perf_counter()
-            response = requests.get(
+            start_time = time.perf_counter_ns()
+            response = self._session.get(
                 self.target,
                 timeout=self.timeout,
                 allow_redirects=True,
-                verify=self.verify_ssl,
-                headers={'User-Agent': 'ServiceMonitor/1.0'}
+                verify=self.verify_ssl
             )
-            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            elapsed_ns = time.perf_counter_ns() - start_time
             
             # Considera sucesso status codes 2xx e 3xx
             if 200 <= response.status_code < 400:
-                return True, elapsed_ms, None
+                return True, elapsed_ns, None
             else:
-                return False, elapsed_ms, f"HTTP {response.status_code}"
+                return False, elapsed_ns, f"HTTP {response.status_code}"
                 
         except requests.exceptions.Timeout:
-            elapsed_ms = self.timeout * 1000
-            return False, elapsed_ms, "Timeout"
+            return False, self._timeout_ns, "Timeout"
         except requests.exceptions.ConnectionError as e:
-            return False, 0.0, f"Connection Error: {str(e)}"
+            return False, 0, f"Connection Error: {str(e)}"
         except Exception as e:
-            return False, 0.0, f"Error: {str(e)}"
+            return False, 0, f"Error: {str(e)}"
+    
+    def _resolve_tcp_addr(self):
+        """Resolve o host do alvo TCP e guarda o endereço em cache"""
+        self._tcp_addr = (socket.gethostbyname(self._tcp_host), self._tcp_port)
+        self._tcp_resolved_at = time.monotonic()
     
-    def _check_tcp(self) -> tuple[bool, float, Optional[str]]:
+    def _check_tcp(self) -> tuple[bool, int, Optional[str]]:
         """
         Verifica disponibilidade via TCP
-        Retorna: (sucesso, tempo_resposta_ms, mensagem_erro)
+        Retorna: (sucesso, tempo_resposta_ns, mensagem_erro)
         """
         try:
-            # Parse host e porta
-            if ':' in self.target:
-                host, port = self.target.rsplit(':', 1)
-                port = int(port)
-            else:
-                return False, 0.0, "Formato inválido. Use host:porta"
+            # Renova o cache DNS somente após expirar o TTL
+            if time.monotonic() - self._tcp_resolved_at > DNS_CACHE_TTL:
+                self._resolve_tcp_addr()
             
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            
-            start_time = time.perf_counter()
-            result = sock.connect_ex((host, port))
-            elapsed_ms = (time.perf_counter() - start_time) * 1000
-            sock.close()
+            try:
+                sock.setblocking(False)
+                # Fecha com RST para não acumular portas efêmeras em TIME_WAIT
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                
+                with selectors.DefaultSelector() as selector:
+                    start_time = time.perf_counter_ns()
+                    result = sock.connect_ex(self._tcp_addr)
+                    if result in CONNECT_IN_PROGRESS:
+                        # Socket fica gravável quando o handshake termina (SYN-ACK ou recusa)
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        if not selector.select(self.timeout):
+                            raise socket.timeout()
+                        result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    elapsed_ns = time.perf_counter_ns() - start_time
+            finally:
+                sock.close()
             
             if result == 0:
-                return True, elapsed_ms, None
+                return True, elapsed_ns, None
             else:
-                return False, elapsed_ms, f"Connection refused (code: {result})"
+                return False, elapsed_ns, f"Connection refused (code: {result})"
                 
         except socket.timeout:
-            elapsed_ms = self.timeout * 1000
-            return False, elapsed_ms, "Timeout"
+            return False, self._timeout_ns, "Timeout"
         except socket.gaierror:
-            return False, 0.0, "DNS resolution failed"
+            return False, 0, "DNS resolution failed"
         except Exception as e:
-            return False, 0.0, f"Error: {str(e)}"
+            return False, 0, f"Error: {str(e)}"
     
-    def _check_icmp(self) -> tuple[bool, float, Optional[str]]:
+    def _check_icmp(self) -> tuple[bool, int, Optional[str]]:
         """
         Verifica disponibilidade via ICMP (ping)
-        Retorna: (sucesso, tempo_resposta_ms, mensagem_erro)
+        Retorna: (sucesso, tempo_resposta_ns, mensagem_erro)
         """
-        import subprocess
-        import platform
+        if self._icmp_sock is None:
+            return self._check_icmp_subprocess()
         
         try:
-            # Determina comando ping baseado no SO
-            param = '-n' if platform.system().lower() == 'windows' else '-c'
-            timeout_param = '-w' if platform.system().lower() == 'windows' else '-W'
-            
-            start_time = time.perf_counter()
+            # Um único socket é compartilhado: verificações sobrepostas são serializadas
+            with self._icmp_lock:
+                self._icmp_seq = (self._icmp_seq + 1) & 0xFFFF
+                seq = self._icmp_seq
+                checksum = _icmp_checksum(self._icmp_base_sum + seq)
+                packet = ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, self._icmp_ident, seq)
+                
+                start_time = time.perf_counter_ns()
+                deadline = start_time + self._timeout_ns
+                self._icmp_sock.sendto(packet, (self._icmp_addr, 0))
+                if self._icmp_reply_ident is None:
+                    # No Linux o kernel troca o identificador pela "porta" do socket; fora dele vale o nosso
+                    self._icmp_reply_ident = self._icmp_sock.getsockname()[1] or self._icmp_ident
+                
+                # Descarta respostas atrasadas de verificações anteriores
+                while True:
+                    remaining = deadline - time.perf_counter_ns()
+                    if remaining <= 0:
+                        raise socket.timeout()
+                    self._icmp_sock.settimeout(remaining / 1e9)
+                    data, addr = self._icmp_sock.recvfrom(1024)
+                    elapsed_ns = time.perf_counter_ns() - start_time
+                    
+                    # Alguns sistemas (ex.: macOS) entregam a resposta com o cabeçalho IP
+                    if len(data) >= 20 and data[0] >> 4 == 4:
+                        data = data[(data[0] & 0x0F) * 4:]
+                    if len(data) < 8 or addr[0] != self._icmp_addr:
+                        continue
+                    icmp_type, _, _, reply_ident, reply_seq = ICMP_HEADER.unpack_from(data)
+                    if (icmp_type == ICMP_ECHO_REPLY and reply_seq == seq
+                            and reply_ident == self._icmp_reply_ident):
+                        return True, elapsed_ns, None
+                    
+        except socket.timeout:
+            return False, self._timeout_ns, "Timeout"
+        except OSError:
+            return False, 0, "Host unreachable"
+        except Exception as e:
+            return False, 0, f"Error: {str(e)}"
+    
+    def _check_icmp_subprocess(self) -> tuple[bool, int, Optional[str]]:
+        """
+        Verifica disponibilidade via comando ping do sistema (fallback sem socket ICMP)
+        Retorna: (sucesso, tempo_resposta_ns, mensagem_erro)
+        """
+        try:
+            start_time = time.perf_counter_ns()
             result = subprocess.run(
-                ['ping', param, '1', timeout_param, str(int(self.timeout)), self.target],
+                self._ping_argv,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 timeout=self.timeout + 1
             )
-            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            elapsed_ns = time.perf_counter_ns() - start_time
             
             if result.returncode == 0:
                 # Tenta extrair tempo de resposta do output
-                output = result.stdout.decode()
-                if 'time=' in output:
-                    try:
-                        time_str = output.split('time=')[1].split()[0]
-                        actual_time = float(time_str.replace('ms', ''))
-                        return True, actual_time, None
-                    except:
-                        pass
-                return True, elapsed_ms, None
+                match = PING_TIME_RE.search(result.stdout)
+                if match:
+                    return True, int(float(match.group(1)) * 1_000_000), None
+                return True, elapsed_ns, None
             else:
-                return False, elapsed_ms, "Host unreachable"
+                return False, elapsed_ns, "Host unreachable"
                 
         except subprocess.TimeoutExpired:
-            return False, self.timeout * 1000, "Timeout"
+            return False, self._timeout_ns, "Timeout"
         except Exception as e:
-            return False, 0.0, f"Error: {str(e)}"
+            return False, 0, f"Error: {str(e)}"
     
-    def _check_service(self) -> tuple[bool, float, Optional[str]]:
+    def _check_service(self) -> tuple[bool, int, Optional[str]]:
         """Executa verificação baseada no tipo configurado"""
         if self.check_type == 'http':
             return self._check_http()
@@ -205,51 +613,39 @@ class ServiceMonitor:
         else:
             raise ValueError(f"Tipo de verificação inválido: {self.check_type}")
     
-    def _print_status(self, success: bool, response_time: float, error_msg: Optional[str]):
+    def _print_status(self, success: bool, response_time: int, error_msg: Optional[str]):
         """Imprime status da verificação com cores"""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        
-        # Cores ANSI
-        GREEN = '\033[92m'
-        RED = '\033[91m'
-        YELLOW = '\033[93m'
-        RESET = '\033[0m'
-        BOLD = '\033[1m'
+        timestamp = STATUS_TIMESTAMP.format(time.time())
         
         if success:
             # Verifica se tempo de resposta excede threshold
-            if response_time > self.threshold:
-                color = YELLOW
-                status = "⚠️  LENTO"
-                details = f"({response_time:.2f}ms > {self.threshold}ms threshold)"
+            if response_time > self._threshold_ns:
+                status = 'slow'
+                details = f"({response_time / 1e6:.2f}ms > {self.threshold}ms threshold)"
             else:
-                color = GREEN
-                status = "✅ UP"
-                details = f"({response_time:.2f}ms)"
-            
-            print(f"{timestamp} | {color}{BOLD}{status}{RESET} {details}")
+                status = 'up'
+                details = f"({response_time / 1e6:.2f}ms)"
         else:
-            color = RED
-            status = "❌ DOWN"
+            status = 'down'
             details = error_msg if error_msg else "Unknown error"
             if response_time > 0:
-                details += f" (após {response_time:.2f}ms)"
-            
-            print(f"{timestamp} | {color}{BOLD}{status}{RESET} {details}")
+                details += f" (após {response_time / 1e6:.2f}ms)"
             
             # Log evento de downtime
-            log_msg = f"DOWNTIME: {details}"
-            self._log(log_msg)
+            self._log(f"DOWNTIME: {details}")
+        
+        sys.stdout.write(f"{timestamp} | {self._status_prefix}{STATUS_LABELS[status]} {details}\n")
     
     def _print_statistics(self):
         """Imprime estatísticas finais"""
         uptime = self.stats.get_uptime_percentage()
         avg_time = self.stats.get_avg_response_time()
-        median_time = self.stats.get_median_response_time()
-        duration = time.time() - self.stats.start_time
+        median_time, p95_time, p99_time = self.stats.get_response_percentiles(50, 95, 99)
+        duration = time.monotonic() - self.stats.start_time
         
         print("\n" + "="*60)
-        print("📊 ESTATÍSTICAS DO MONITORAMENTO")
+        print(f"📊 ESTATÍSTICAS DO MONITORAMENTO - {self.label}" if self.label
+              else "📊 ESTATÍSTICAS DO MONITORAMENTO")
         print("="*60)
         print(f"⏱️  Duração total: {duration:.2f}s")
         print(f"🔍 Total de verificações: {self.stats.total_checks}")
@@ -257,12 +653,16 @@ class ServiceMonitor:
         print(f"❌ Verificações falhadas: {self.stats.failed_checks}")
         print(f"📈 Uptime: {uptime:.2f}%")
         
-        if self.stats.response_times:
+        if self.stats.response_count:
             print(f"\n⚡ Tempos de resposta:")
             print(f"   Média: {avg_time:.2f}ms")
             print(f"   Mediana: {median_time:.2f}ms")
-            print(f"   Mínimo: {min(self.stats.response_times):.2f}ms")
-            print(f"   Máximo: {max(self.stats.response_times):.2f}ms")
+            print(f"   p95: {p95_time:.2f}ms")
+            print(f"   p99: {p99_time:.2f}ms")
+            print(f"   Mínimo: {self.stats.response_time_min / 1e6:.2f}ms")
+            print(f"   Máximo: {self.stats.response_time_max / 1e6:.2f}ms")
+            if self.stats.max_samples and self.stats.response_count > self.stats.max_samples:
+                print(f"   (mediana e percentis das últimas {self.stats.max_samples} amostras)")
         
         if self.stats.downtime_events:
             print(f"\n🚨 Total de eventos de downtime: {len(self.stats.downtime_events)}")
@@ -274,14 +674,107 @@ class ServiceMonitor:
         
         print("="*60)
         
-        if self.log_file:
+        if self._log_writer and self._log_writer.error:
+            print(f"\n⚠️  Log incompleto em {self.log_file}: {self._log_writer.error}")
+        elif self.log_file:
             print(f"\n📝 Log completo salvo em: {self.log_file}")
     
-    def run(self):
-        """Executa loop de monitoramento"""
+    def _warn_interval_exceeded(self, delay: float):
+        """Registra que as verificações não estão cabendo no intervalo configurado"""
+        self._log(f"WARNING: verificação excedeu o intervalo ({delay * 1000:.2f}ms de atraso)")
+        if not self._interval_warned:
+            self._interval_warned = True
+            print(f"{YELLOW}⚠️  Verificações excedendo o intervalo de {self.interval}s; "
+                  f"considere aumentar -i{RESET}", file=sys.stderr)
+    
+    def _check_if_running(self) -> Optional[tuple[bool, int, Optional[str]]]:
+        """Executa a verificação, a menos que o monitoramento já tenha sido interrompido"""
+        if not self.running:
+            return None
+        return self._check_service()
+    
+    async def _check_and_record(self):
+        """Executa uma verificação e registra o resultado"""
+        # As verificações são bloqueantes; executá-las em thread mantém o agendador livre
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, self._check_if_running)
+        if result is None:
+            # Interrompido antes de a verificação começar: não conta nas estatísticas
+            return
+        success, response_time, error_msg = result
+        
+        self.stats.total_checks += 1
+        if success:
+            self.stats.successful_checks += 1
+            if self._discard_next_sample:
+                # Aquecimento não concluído a tempo: a primeira amostra ainda é "fria"
+                self._discard_next_sample = False
+            else:
+                self.stats.add_response_time(response_time)
+        else:
+            self.stats.failed_checks += 1
+            downtime_event = f"{_now_str()} - {error_msg}"
+            self.stats.downtime_events.append(downtime_event)
+        
+        self._print_status(success, response_time, error_msg)
+        
+        # Log todos os eventos
+        self._log_check(success, response_time, error_msg)
+    
+    async def _spawn_check(self, pending: set):
+        """Dispara uma verificação em segundo plano respeitando MAX_IN_FLIGHT"""
+        # Uma verificação lenta pode se sobrepor à próxima, sem atrasar o agendamento
+        if len(pending) >= self.MAX_IN_FLIGHT:
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        
+        task = asyncio.create_task(self._check_and_record())
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    
+    async def _run_interval(self, pending: set):
+        """Dispara verificações em prazos fixos, a cada self.interval segundos"""
+        loop = asyncio.get_running_loop()
+        next_deadline = loop.time()
+        while self.running:
+            await self._spawn_check(pending)
+            
+            next_deadline += self.interval
+            sleep_for = next_deadline - loop.time()
+            if sleep_for > 0:
+                await asyncio.sleep(sleep_for)
+            else:
+                # Atrasado: recomeça a partir de agora em vez de disparar verificações em rajada
+                self._warn_interval_exceeded(-sleep_for)
+                next_deadline = loop.time()
+                await asyncio.sleep(0)
+    
+    async def _run_rate(self, pending: set):
+        """Dispara self.rate verificações por segundo usando token bucket"""
+        loop = asyncio.get_running_loop()
+        # Capacidade do balde: no máximo o acumulado em uma espera, evitando rajadas após atrasos
+        capacity = max(1.0, self.rate * RATE_MAX_SLEEP)
+        tokens = 1.0
+        last = loop.time()
+        while self.running:
+            now = loop.time()
+            tokens = min(capacity, tokens + (now - last) * self.rate)
+            last = now
+            
+            # Várias verificações por despertar: não depende da granularidade do sleep do SO
+            while tokens >= 1 and self.running:
+                await self._spawn_check(pending)
+                tokens -= 1
+            
+            await asyncio.sleep(min(RATE_MAX_SLEEP, (1 - tokens) / self.rate))
+    
+    async def run_async(self):
+        """Executa loop de monitoramento com verificações em prazos fixos ou taxa constante"""
         print(f"🔍 Iniciando monitoramento de {self.target}")
         print(f"📡 Tipo: {self.check_type.upper()}")
-        print(f"⏱️  Intervalo: {self.interval}s")
+        if self.rate:
+            print(f"⏱️  Taxa: {self.rate} verificações/s")
+        else:
+            print(f"⏱️  Intervalo: {self.interval}s")
         print(f"⏳ Timeout: {self.timeout}s")
         print(f"🎯 Threshold: {self.threshold}ms")
         if self.check_type == 'http':
@@ -291,28 +784,30 @@ class ServiceMonitor:
             print(f"📝 Log: {self.log_file}")
         print(f"\n{'='*60}\n")
         
+        # Espera no executor do próprio monitor: o pool padrão do loop é dividido entre todos os alvos
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(self._executor, self._warmup_done.wait, WARMUP_TIMEOUT):
+            self._discard_next_sample = True
+        
+        pending = set()
+        
         try:
-            while self.running:
-                success, response_time, error_msg = self._check_service()
-                
-                self.stats.total_checks += 1
-                if success:
-                    self.stats.successful_checks += 1
-                    self.stats.response_times.append(response_time)
-                else:
-                    self.stats.failed_checks += 1
-                    downtime_event = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} - {error_msg}"
-                    self.stats.downtime_events.append(downtime_event)
-                
-                self._print_status(success, response_time, error_msg)
-                
-                # Log todos os eventos
-                log_status = "SUCCESS" if success else "FAILURE"
-                self._log(f"{log_status}: {response_time:.2f}ms - {error_msg if error_msg else 'OK'}")
-                
-                time.sleep(self.interval)
+            if self.rate:
+                await self._run_rate(pending)
+            else:
+                await self._run_interval(pending)
+            
+            # Aguarda verificações ainda em andamento para fechar as estatísticas
+            if pending:
+                await asyncio.gather(*pending)
         
         finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._owns_session:
+                self._session.close()
+            if self._log_writer:
+                # flush bloqueia: em thread para não travar os outros monitores do mesmo loop
+                await asyncio.to_thread(self._log_writer.flush)
             self._print_statistics()
 
 
@@ -331,17 +826,27 @@ Exemplos de uso:
   # Monitorar via ICMP com log
   %(prog)s 8.8.8.8 -t icmp -l monitor.log
   
+  # Log binário compacto para intervalos muito curtos (ler com monitor_dump.py)
+  %(prog)s https://api.exemplo.com/health -i 0.001 -l monitor.bin --log-format binary
+  
   # Verificação ultra-rápida (10ms de intervalo)
   %(prog)s https://api.exemplo.com/health -i 0.01 -T 5
   
+  # 1000 verificações por segundo com token bucket
+  %(prog)s exemplo.com:5432 -t tcp -r 1000
+  
   # Ignorar validação SSL (certificados auto-assinados)
   %(prog)s https://dev.interno.com -k -i 0.1
+  
+  # Monitorar vários alvos ao mesmo tempo
+  %(prog)s https://exemplo.com.br https://api.exemplo.com/health -i 0.1
         """
     )
     
     parser.add_argument(
         'target',
-        help='Alvo do monitoramento (URL, host:porta ou IP)'
+        nargs='+',
+        help='Alvo(s) do monitoramento (URL, host:porta ou IP); vários alvos são monitorados em paralelo'
     )
     
     parser.add_argument(
@@ -351,13 +856,21 @@ Exemplos de uso:
         help='Tipo de verificação (padrão: http)'
     )
     
-    parser.add_argument(
+    pacing = parser.add_mutually_exclusive_group()
+    
+    pacing.add_argument(
         '-i', '--interval',
         type=float,
         default=1.0,
         help='Intervalo entre verificações em segundos (padrão: 1.0, mínimo: 0.001)'
     )
     
+    pacing.add_argument(
+        '-r', '--rate',
+        type=float,
+        help='Verificações por segundo (token bucket), alternativa a -i para taxas altas'
+    )
+    
     parser.add_argument(
         '-o', '--timeout',
         type=float,
@@ -377,6 +890,20 @@ Exemplos de uso:
         help='Arquivo para salvar log detalhado'
     )
     
+    parser.add_argument(
+        '--log-format',
+        choices=['text', 'binary'],
+        default='text',
+        help='Formato do arquivo de log (padrão: text; binary é mais compacto, leia com monitor_dump.py)'
+    )
+    
+    parser.add_argument(
+        '--max-samples',
+        type=int,
+        default=DEFAULT_MAX_SAMPLES,
+        help='Amostras de tempo de resposta mantidas para a mediana (padrão: 100000, 0 = ilimitado)'
+    )
+    
     parser.add_argument(
         '-k', '--no-verify',
         action='store_true',
@@ -386,6 +913,10 @@ Exemplos de uso:
     args = parser.parse_args()
     
     # Validações
+    if args.rate is not None and args.rate <= 0:
+        print("❌ Erro: taxa deve ser maior que 0", file=sys.stderr)
+        sys.exit(1)
+    
     if args.interval < 0.001:
         print("❌ Erro: intervalo mínimo é 0.001s (1ms)", file=sys.stderr)
         sys.exit(1)
@@ -394,28 +925,72 @@ Exemplos de uso:
         print("❌ Erro: timeout deve ser maior que 0", file=sys.stderr)
         sys.exit(1)
     
-    # Auto-detectar tipo se não especificado
-    if args.type == 'http' and not args.target.startswith(('http://', 'https://')):
-        if ':' in args.target and args.target.split(':')[-1].isdigit():
-            print(f"ℹ️  Auto-detectado tipo TCP (porta especificada)")
-            args.type = 'tcp'
-    
-    # Adicionar http:// se necessário
-    if args.type == 'http' and not args.target.startswith(('http://', 'https://')):
-        args.target = f"http://{args.target}"
-    
-    # Criar e executar monitor
-    monitor = ServiceMonitor(
-        target=args.target,
-        check_type=args.type,
-        interval=args.interval,
-        timeout=args.timeout,
-        threshold=args.threshold,
-        log_file=args.log_file,
-        verify_ssl=not args.no_verify
-    )
+    if args.log_format == 'binary' and not args.log_file:
+        print("❌ Erro: --log-format binary requer -l/--log-file", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.max_samples < 0:
+        print("❌ Erro: --max-samples não pode ser negativo", file=sys.stderr)
+        sys.exit(1)
+    
+    monitors = []
+    multiple = len(args.target) > 1
+    
+    # Sessão HTTP e log compartilhados por todos os alvos
+    session = create_http_session(pool_connections=len(args.target),
+                                  pool_maxsize=ServiceMonitor.MAX_IN_FLIGHT)
+    log_writer = LogWriter(args.log_file, binary=args.log_format == 'binary') if args.log_file else None
+    
+    for target in args.target:
+        check_type = args.type
+        
+        # Auto-detectar tipo se não especificado
+        if check_type == 'http' and not target.startswith(('http://', 'https://')):
+            if ':' in target and target.split(':')[-1].isdigit():
+                print(f"ℹ️  Auto-detectado tipo TCP para {target} (porta especificada)")
+                check_type = 'tcp'
+        
+        # Adicionar http:// se necessário
+        if check_type == 'http' and not target.startswith(('http://', 'https://')):
+            target = f"http://{target}"
+        
+        # Criar monitor
+        try:
+            monitors.append(ServiceMonitor(
+                target=target,
+                check_type=check_type,
+                interval=args.interval,
+                rate=args.rate,
+                timeout=args.timeout,
+                threshold=args.threshold,
+                verify_ssl=not args.no_verify,
+                max_samples=args.max_samples,
+                session=session,
+                log_writer=log_writer,
+                label=target if multiple else None
+            ))
+        except ValueError as e:
+            print(f"❌ Erro: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    def signal_handler(signum, frame):
+        """Handler para interrupção graceful de todos os monitores"""
+        print("\n\n🛑 Interrompendo monitoramento...")
+        for monitor in monitors:
+            monitor.running = False
+    
+    # Configurar handler para Ctrl+C
+    signal.signal(signal.SIGINT, signal_handler)
+    
+    async def run_all():
+        await asyncio.gather(*(monitor.run_async() for monitor in monitors))
     
-    monitor.run()
+    try:
+        asyncio.run(run_all())
+    finally:
+        session.close()
+        if log_writer:
+            log_writer.close()
 
 
 if __name__ == '__main__':
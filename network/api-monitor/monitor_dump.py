@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Monitor Dump - Converte o log binário do Service Monitor (--log-format binary) em texto
+"""
+
+import argparse
+import sys
+
+from monitor import (
+    ERROR_CODES,
+    ERROR_OK,
+    LOG_CHECK_RECORD,
+    LOG_KIND_CHECK,
+    LOG_KIND_TARGET,
+    LOG_TARGET_RECORD,
+    LOG_TIMESTAMP,
+)
+
+ERROR_NAMES = {code: name for name, code in ERROR_CODES.items()}
+
+
+def describe_error(code: int) -> str:
+    """Converte o código de erro de volta em uma mensagem legível"""
+    if code == ERROR_OK:
+        return 'OK'
+    if 100 <= code < 600:
+        return f"HTTP {code}"
+    return ERROR_NAMES.get(code, 'Error')
+
+
+def dump(path: str):
+    """Imprime cada verificação registrada no mesmo formato do log texto"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    
+    # Cada execução registra seus alvos antes das verificações; o registro mais recente vale
+    targets = {}
+    offset = 0
+    while offset < len(data):
+        kind = data[offset]
+        target_name = None
+        if kind == LOG_KIND_TARGET and offset + LOG_TARGET_RECORD.size <= len(data):
+            _, target_id, name_len = LOG_TARGET_RECORD.unpack_from(data, offset)
+            name_start = offset + LOG_TARGET_RECORD.size
+            if name_start + name_len <= len(data):
+                try:
+                    target_name = data[name_start:name_start + name_len].decode('utf-8')
+                except UnicodeDecodeError:
+                    pass
+        if target_name is not None:
+            targets[target_id] = target_name
+            offset = name_start + name_len
+        elif kind == LOG_KIND_CHECK and offset + LOG_CHECK_RECORD.size <= len(data):
+            _, ts_ns, success, response_time, code, target_id = LOG_CHECK_RECORD.unpack_from(data, offset)
+            offset += LOG_CHECK_RECORD.size
+            timestamp = LOG_TIMESTAMP.format(ts_ns / 1e9)
+            log_status = "SUCCESS" if success else "FAILURE"
+            target = targets.get(target_id, f"alvo {target_id}")
+            print(f"[{timestamp}] [{target}] {log_status}: {response_time / 1e6:.2f}ms - {describe_error(code)}")
+        else:
+            print(f"⚠️  Registro inválido ou incompleto no byte {offset}, leitura interrompida", file=sys.stderr)
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Converte o log binário do Service Monitor em texto'
+    )
+    
+    parser.add_argument(
+        'log_file',
+        help='Arquivo gerado com --log-format binary'
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        dump(args.log_file)
+    except OSError as e:
+        print(f"❌ Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()